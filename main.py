@@ -42,16 +42,49 @@
 import pygame as pg
 import sys
 import random as r
+from collections import deque
+
+# Costumes are loaded and scaled only once for each (name, scale) pair,
+# and the same surfaces are shared by all sprites.
+_COSTUME_CACHE = {}
+
+def load_costume(name, scale):
+    key = (name, scale)
+    if key not in _COSTUME_CACHE:
+        raw_costume = pg.image.load(name + ".png").convert_alpha()
+        _COSTUME_CACHE[key] = pg.transform.rotozoom(raw_costume, 0, scale)
+    return _COSTUME_CACHE[key]
+
+# Sounds are loaded only once for each file, and shared by all objects.
+_SOUNDS = {}
+
+def load_sound(name):
+    if name not in _SOUNDS:
+        _SOUNDS[name] = pg.mixer.Sound(name)
+    return _SOUNDS[name]
+
+# Fonts are created only once for each size, and shared by all objects.
+_DEFAULT_FONT = pg.font.get_default_font()
+_FONT_CACHE = {}
+
+def get_font(size):
+    if size not in _FONT_CACHE:
+        _FONT_CACHE[size] = pg.font.SysFont(_DEFAULT_FONT, size)
+    return _FONT_CACHE[size]
 
 """
     This is a basic class for simple sprites. It can be used in various game projects. Specific sprites will be subclasses of it, inheriting its attributes ans methods.
+    It is a Pygame dirty sprite, so that a sprite group can redraw it only when it has changed. Its grid coordinates are turned into a Pygame image and rect when it is placed.
 """
-class Sprite():
+class Sprite(pg.sprite.DirtySprite):
     def __init__(self, scale, costume_names, x, y, vx = 0, vy = 0):
-        raw_costumes = [pg.image.load(name + ".png") for name in costume_names]
-        self.costumes = [pg.transform.rotozoom(s, 0, scale) for s in raw_costumes]
+        pg.sprite.DirtySprite.__init__(self)
+        self.costumes = [load_costume(name, scale) for name in costume_names]
         self.costume = self.costumes[0]
-        self.rect = self.costume.get_rect()
+        self.image = self.costume
+        self.rect = self.image.get_rect()
+        # All costumes are square and of the same size.
+        self.half = self.costume.get_width() // 2
         self.x = x
         self.y = y
         self.vx = vx
@@ -63,9 +96,20 @@ class Sprite():
         self.y += self.vy
 
     # This method displays the sprite in the stage.
+    # It returns the area of the stage that has been changed.
     def display(self, stage, step):
-        self.rect.center = ((self.x + 1) * step, (self.y + 1) * step)
-        stage.blit(self.costume, self.rect)
+        return stage.blit(self.costume, self.position(self.x, self.y, step))
+
+    # This method puts the sprite to its grid position in its sprite group.
+    # It is redrawn when the group is drawn next time.
+    def place(self, step):
+        self.image = self.costume
+        self.rect.topleft = self.position(self.x, self.y, step)
+        self.dirty = 1
+
+    # The top left pixel of the costume when placed on the (x, y) grid cell.
+    def position(self, x, y, step):
+        return ((x + 1) * step - self.half, (y + 1) * step - self.half)
 
     # Since the sprites move on a grid, collision is coordinate based.
     def collides(self, other):
@@ -74,168 +118,232 @@ class Sprite():
 """
     Segments are the parts of the tail of a snake.
     A segment is a sprite with a single costume. It has no other attribute.
+    The tail itself is stored as coordinates; segments are only used to display them.
 """
 class Segment(Sprite):
     def __init__(self, scale, x, y, color):
         Sprite.__init__(self, scale, ["segment_{}".format(color)], x, y)
-    # A segment moves in a special way,
-    # to the coordinates of another segment (or the head).
-    def move(self, other):
-        self.x = other.x
-        self.y = other.y
 
 """
-    A head the front part of a snake. is another sprite with a single costume. It has a special moving method; a string parameter decides its direction.
+    A head the front part of a snake. is another sprite with a single costume. It moves by its velocity like any sprite, but it wraps around at the edges of the grid. The velocity is set by the snake when it turns.
 """
 class Head(Sprite):
     def __init__(self, scale, x, y, max_x, max_y, color):
-        Sprite.__init__(self, scale, ["head_{}".format(color)], x, y, scale)
+        Sprite.__init__(self, scale, ["head_{}".format(color)], x, y)
+        # The head is displayed above the segments.
+        self.layer = 1
         self.max_x = max_x
         self.max_y = max_y
 
-    def move(self, direction):
-        if direction == "down":
-            self.y += 1
-            if self.y == self.max_y:
-                self.y = 0
-        elif direction == "up":
-            self.y -= 1
-            if self.y == -1:
-                self.y = self.max_y - 1
-        elif direction == "right":
-            self.x += 1
-            if self.x == self.max_x:
-                self.x = 0
-        elif direction == "left":
-            self.x -= 1
-            if self.x == -1:
-                self.x = self.max_x - 1
+    def move(self):
+        self.x = (self.x + self.vx) % self.max_x
+        self.y = (self.y + self.vy) % self.max_y
 
 """
-    A snake is a complex object consisting of a head, a tail that is a list of its body sections, and a few other attributes. Its direction will determine the movement of the head; and the tail will follow the head. It cannot turn in opposite direction.
+    A snake is a complex object consisting of a head, a tail that is a deque of the coordinates of its body sections, and a few other attributes. Its direction will determine the movement of the head; and the tail will follow the head. It cannot turn in opposite direction.
+    The segments displaying the tail are kept in another deque, in the same order as the tail. The head and the segments are put in the sprite group of the game.
+    Segments are never removed from the group: at reset they are hidden and kept in a pool, and they are reused when the snake grows again.
 """
 class Snake():
-    def __init__(self, scale, direction, x, y, max_x, max_y, key_map, color):
+    def __init__(self, scale, step, direction, x, y, max_x, max_y, key_map, color, group, on_score_changed):
         self.scale = scale
+        self.step = step
         self.color = color
+        self.group = group
         self.head = Head(scale, x, y, max_x, max_y, color)
+        self.group.add(self.head)
+        self.segments = deque()
+        self.spare_segments = []
         self.opposites = {"right":"left", "left":"right",
                             "up":"down", "down":"up"}
+        self.dir_vec = {"right":(1, 0), "left":(-1, 0),
+                            "up":(0, -1), "down":(0, 1)}
         self.init_direction = direction
         self.init_x = x
         self.init_y = y
         self.key_map = key_map
-        self.eat_sound = pg.mixer.Sound("eat.wav")
+        self.eat_sound = load_sound("eat.wav")
+        # The game is notified about every change of the score.
+        self.on_score_changed = on_score_changed
+        self.score = 0
         self.reset()
 
     # At reset, a snake is put back to its initial position.
     # Its tail is cut back, and it uses all its points.
     # Its keybuffer is emptied, too, to avoid unintended turns.
     def reset(self):
-        self.direction = self.init_direction
+        self.set_direction(self.init_direction)
         self.head.x = self.init_x
         self.head.y = self.init_y
-        self.tail = []
+        self.tail = deque()
+        self.tail_set = set()
+        for segment in self.segments:
+            segment.visible = 0
+        self.spare_segments.extend(self.segments)
+        self.segments = deque()
+        self.pending_growth = 0
         self.grow(2)
-        self.score = 0
-        self.key_buffer = []
+        if self.score != 0:
+            self.on_score_changed(-self.score)
+            self.score = 0
+        # At most a few key presses are buffered, even if keys are mashed.
+        self.key_buffer = deque(maxlen=4)
         # The head is moved to avoid collision after reset.
-        self.head.move(self.direction)
-
-    # This method displays the head and the segments.
-    def display(self, stage, step):
-        for segment in self.tail:
-            segment.display(stage, step)
-        self.head.display(stage, step)
+        self.head.move()
+        self.head.place(self.step)
+
+    # This method puts a segment to the given cell.
+    # A hidden segment from the pool is reused if there is one.
+    def new_segment(self, cell):
+        if self.spare_segments:
+            segment = self.spare_segments.pop()
+            segment.visible = 1
+        else:
+            segment = Segment(self.scale, 0, 0, self.color)
+            self.group.add(segment)
+        segment.x, segment.y = cell
+        segment.place(self.step)
+        return segment
 
     # The head moves in the direction of the snake.
-    # All segments replace the ones ahead of them.
+    # Its old place is added to the front of the tail,
+    # and the end of the tail is removed, unless the snake is growing.
+    # The last segment is moved to the front, so only two sprites change:
+    # the head and that segment. A growing snake gets a new segment instead.
     def move(self):
-        if self.key_buffer != []:
-            new_dir = self.key_buffer.pop(0)
+        if self.key_buffer:
+            new_dir = self.key_buffer.popleft()
             self.turn(self.key_map[new_dir])
-        for i in range(0, len(self.tail)-1):
-            segment = self.tail[i]
-            segment_ahead = self.tail[i+1]
-            segment.move(segment_ahead)
-        self.tail[-1].move(self.head)
-        self.head.move(self.direction)
+        neck = (self.head.x, self.head.y)
+        self.tail.appendleft(neck)
+        self.tail_set.add(neck)
+        if self.pending_growth > 0:
+            self.pending_growth -= 1
+            self.segments.appendleft(self.new_segment(neck))
+        else:
+            vacated = self.tail.pop()
+            # The initial segments are stacked, so the cell may still be taken.
+            if vacated != self.tail[-1]:
+                self.tail_set.discard(vacated)
+            segment = self.segments.pop()
+            segment.x, segment.y = neck
+            segment.place(self.step)
+            self.segments.appendleft(segment)
+        self.head.move()
+        self.head.place(self.step)
 
     # This method is called at keydown events.
     # The snake doesn't turn to a direction opposite to its current one.
     def turn(self, new_direction):
         if not new_direction == self.opposites[self.direction]:
-            self.direction = new_direction
+            self.set_direction(new_direction)
+
+    # The velocity of the head is looked up only when the direction changes.
+    def set_direction(self, direction):
+        self.direction = direction
+        self.head.vx, self.head.vy = self.dir_vec[direction]
 
-    # When the snake grows, its tail gets appended by new segments.
-    # New segments are all at the same place at first,
-    # and then they move one by one.
-    # Thus it looks like as if they were added one by one.
+    # When the snake grows, the end of its tail stays in place
+    # for as many moves as the length of the growth.
+    # Thus it looks like as if new segments were added one by one.
+    # A new snake gets its initial segments stacked at the head.
     def grow (self, length):
-        if self.tail == []:
-            last = self.head
+        if not self.tail:
+            cell = (self.head.x, self.head.y)
+            self.tail.extend([cell] * length)
+            self.tail_set.add(cell)
+            self.segments.extend([self.new_segment(cell) for _ in range(length)])
         else:
-            last = self.tail[0]
+            self.pending_growth += length
             self.score += length
-        new_tail = [Segment(self.scale, last.x, last.y, self.color) for _ in range(length)]
-        self.tail = new_tail + self.tail
+            self.on_score_changed(length)
 
     # This method checks if the head collides with the tail of a snake
     # or a maze cell. Returns True or False.
+    # Occupied cells are kept in sets, so each check is a single lookup.
     def collides(self, snakes, maze):
-        to_check = [x for s in snakes for x in s.tail] + maze.cells
-        return max(map(self.head.collides, to_check))
+        head = (self.head.x, self.head.y)
+        return head in maze.cell_set or any(head in s.tail_set for s in snakes)
 
     # If the head collides with a donut,
     # the snake grows and the donut is reset.
     # The more the donut's value, the more the snake grows.
     def eat_if_you_can(self, donuts):
+        hx, hy = self.head.x, self.head.y
         for donut in donuts:
-            if self.head.x == donut.x and self.head.y == donut.y:
+            if donut.x == hx and donut.y == hy:
                 self.grow(donut.value)
-                donut.to_be_reset = True
                 self.eat_sound.play()
+                donut.on_reset(donut)
 
 # A maze cell is an unmovable piece of sprite.
 class MazeCell(Sprite):
     def __init__(self, scale, x, y):
         Sprite.__init__(self, scale, ["mazecell"], x, y)
 
-# A maze is a list of maze cells. The cells are read from files.
+# A maze is a set of the coordinates of its cells. The cells are read from files.
+# The set is used for fast collision detection.
+# The maze doesn't change during a level, so it is drawn only once
+# to a background surface, together with the background color.
+# A single maze cell sprite is displayed at every coordinate.
 class Maze():
-    def __init__(self, scale, level):
-        self.cells = []
+    def __init__(self, scale, level, step, stage_size, bg_color):
         with open("maze{}.txt".format(level)) as f:
             rows = f.read().split("\n")
-        for y, row in enumerate(rows):
-            for x, cell in enumerate(row):
-                if cell == "#":
-                    self.cells += [MazeCell(scale, x, y)]
+        self.cell_set = {(x, y) for y, row in enumerate(rows)
+                            for x, cell in enumerate(row) if cell == "#"}
+        self.cell = MazeCell(scale, 0, 0)
+        self.bg = pg.Surface(stage_size).convert()
+        self.bg.fill(bg_color)
+        self.display(self.bg, step)
 
     def display(self, stage, step):
-        for cell in self.cells:
+        cell = self.cell
+        for x, y in self.cell_set:
+            cell.x = x
+            cell.y = y
             cell.display(stage, step)
 
 # A donut is a very simple sprite.
+# It is placed by the game, which is called back when the donut has to be reset.
 class Donut(Sprite):
-    def __init__(self, scale, lifetime):
+    def __init__(self, scale, lifetime, on_reset):
         Sprite.__init__(self, scale, ["donut1", "donut2", "donut3"], 0, 0)
+        # The donut is displayed above the segments.
+        self.layer = 1
         self.lifetime = lifetime
-        self.to_be_reset = True
+        self.on_reset = on_reset
 
     def reset(self):
         costume_index = r.randrange(3)
         self.costume = self.costumes[costume_index]
         self.value = 6 + costume_index * 3
         self.age = 0
-        self.to_be_reset = False
 
     # The life cycle of a donut is measured by its age attribute.
-    # Once it reaches the donut's lifetime, the donut is reset.
+    # Once it reaches the donut's lifetime, the donut is expired.
+    # It is reset only after the collisions are checked,
+    # so it can still be eaten in its last tick.
     def move(self):
         self.age += 1
-        if self.age == self.lifetime:
-            self.to_be_reset = True
+
+    def expired(self):
+        return self.age >= self.lifetime
+
+# A label is a text displayed above every sprite.
+# It is a dirty sprite, so it is redrawn only when its text changes.
+class Label(pg.sprite.DirtySprite):
+    def __init__(self):
+        pg.sprite.DirtySprite.__init__(self)
+        self.layer = 2
+        self.image = pg.Surface((0, 0))
+        self.rect = self.image.get_rect()
+
+    def show(self, image, rect):
+        if image is not self.image:
+            self.image = image
+            self.rect = rect
+            self.dirty = 1
 
 class Menu():
     def __init__(self, stage, items, color, bg_color, font_size):
@@ -245,12 +353,22 @@ class Menu():
         self.hcolor = self.colorize(color, 20)
         self.color = self.colorize(color, -20)
         self.bg_color = bg_color
-        self.font = pg.font.SysFont(pg.font.get_default_font(), font_size)
-        self.hfont = pg.font.SysFont(pg.font.get_default_font(), int(font_size*1.2))
+        self.font = get_font(font_size)
+        self.hfont = get_font(int(font_size*1.2))
         self.highlighted = 0
         size_x, size_y = pg.display.get_window_size()
         y_dist = size_y // (len(self.items) + 1)
         self.positions = [(size_x//2, int(y_dist*(i+1))) for i in range(self.length)]
+        # Every item is rendered once, both normal and highlighted.
+        self._items_normal = [self.font.render(item, False, self.color)
+                                for item in self.items]
+        self._items_highlighted = [self.hfont.render(item, False, self.hcolor)
+                                for item in self.items]
+        # The screen is redrawn only when the highlighted item changes.
+        self._last_highlighted = None
+        # Navigation keys and their moves in the menu.
+        self._nav = {pg.K_UP: -1, pg.K_w: -1, pg.K_DOWN: 1, pg.K_s: 1}
+        self.clock = pg.time.Clock()
         self.done = False
 
     def colorize(self, color, diff):
@@ -262,16 +380,19 @@ class Menu():
         return tuple(map(diff_value, color))
 
     def refresh_screen(self):
+        if self.highlighted == self._last_highlighted:
+            return
+        self._last_highlighted = self.highlighted
         self.stage.fill(self.bg_color)
-        for i, x in enumerate(self.items):
+        for i in range(self.length):
             if i == self.highlighted:
-                text = self.hfont.render(self.items[i], False, self.hcolor)
+                text = self._items_highlighted[i]
                 rect = text.get_rect()
                 rect.center = self.positions[i]
                 self.stage.blit(text, rect)
                 self.frame(rect)
             else:
-                text = self.font.render(self.items[i], False, self.color)
+                text = self._items_normal[i]
                 rect = text.get_rect()
                 rect.center = self.positions[i]
                 self.stage.blit(text, rect)
@@ -285,20 +406,23 @@ class Menu():
         for event in pg.event.get():
             if event.type == pg.QUIT:
                 sys.exit()
+            elif event.type == pg.WINDOWEXPOSED:
+                # The screen is redrawn when the window is shown again.
+                self._last_highlighted = None
             elif event.type == pg.KEYDOWN:
                 if event.key == pg.K_ESCAPE:
                     sys.exit()
-                elif event.key in [pg.K_UP, pg.K_w]:
-                    self.highlighted = (self.highlighted - 1) % self.length
-                elif event.key in [pg.K_DOWN, pg.K_w]:
-                    self.highlighted = (self.highlighted + 1) % self.length
-                elif event.key in [pg.K_SPACE, pg.K_RETURN]:
+                elif event.key in self._nav:
+                    delta = self._nav[event.key]
+                    self.highlighted = (self.highlighted + delta) % self.length
+                elif event.key in (pg.K_SPACE, pg.K_RETURN):
                     self.done = True
 
     def menu(self):
         while not self.done:
             self.refresh_screen()
             self.check_keys()
+            self.clock.tick(30)
         pg.time.delay(100)
         return self.highlighted
 
@@ -307,6 +431,10 @@ class Snake_Game():
         # Pygame is initialized.
         pg.init()
         pg.mixer.init()
+        # Only quitting, key presses and window exposure are handled,
+        # other events are not queued.
+        pg.event.set_blocked(None)
+        pg.event.set_allowed([pg.QUIT, pg.KEYDOWN, pg.WINDOWEXPOSED])
         self.scale = scale
         self.players = players
         self.last_level = levels
@@ -317,7 +445,8 @@ class Snake_Game():
         self.size_y = 23
         # images are 30*30 pixels
         # if you change this value, you have to change the image files
-        self.step = 30 * scale
+        # the step is an integer, so that pixel positions are integers, too
+        self.step = int(30 * scale)
         # stage size is 960 * 720
         # window size may differ from this due to scaling
         self.stage_x = (int((self.size_x + 1) * self.step))
@@ -330,19 +459,29 @@ class Snake_Game():
         self.font_color = (210, 210, 40)
         self.font_size = int(60 * scale)
         tfont_size = int(120 * scale)
-        self.font = pg.font.SysFont(pg.font.get_default_font(), self.font_size)
-        self.titlefont = pg.font.SysFont(pg.font.get_default_font(), tfont_size)
+        self.font = get_font(self.font_size)
+        self.titlefont = get_font(tfont_size)
         self.clock = pg.time.Clock()
         self.fps = 5
         self.paused = False
+        # The score is the sum of the scores of the snakes.
+        # It is updated by the snakes whenever their score changes.
+        self.score = 0
+        # Every text is rendered only once, and then reused.
+        self._text_cache = {}
+        # The sprites are drawn by a sprite group, which redraws
+        # and updates on the screen only the areas that have changed.
+        # The whole stage is redrawn after anything covered it.
+        self.sprite_group = pg.sprite.LayeredDirty()
+        self.full_refresh = True
         self.load_sounds()
 
     def load_sounds(self):
-        self.ticksound = pg.mixer.Sound("tick.wav")
-        self.levelsound = pg.mixer.Sound("level.wav")
-        self.menusound = pg.mixer.Sound("level.wav")
-        self.introsound = pg.mixer.Sound("intro.wav")
-        self.collidesound = pg.mixer.Sound("collide.wav")
+        self.ticksound = load_sound("tick.wav")
+        self.levelsound = load_sound("level.wav")
+        self.menusound = self.levelsound
+        self.introsound = load_sound("intro.wav")
+        self.collidesound = load_sound("collide.wav")
 
 # font = pg.font.SysFont(pg.font.get_default_font(), 60)
 # stage.blit(font.render(str(score), False, "white"), (0,0))
@@ -351,6 +490,11 @@ class Snake_Game():
         self.snakes = self.create_snakes()
         self.donuts = self.create_donuts()
         self.sprites = self.snakes + self.donuts
+        # Every control key is mapped to the snake it controls.
+        self._all_key_snakes = {k: s for s in self.snakes for k in s.key_map}
+        self.score_label = Label()
+        self.level_label = Label()
+        self.sprite_group.add(self.donuts, self.score_label, self.level_label)
 
     def create_snakes(self):
         key_map1 = {pg.K_UP: "up", pg.K_DOWN: "down",
@@ -358,86 +502,103 @@ class Snake_Game():
         key_map2 = {pg.K_w: "up", pg.K_s: "down",
                     pg.K_d: "right", pg.K_a: "left"}
         if self.players == 1:
-            snake = Snake(scale=self.scale, direction="right",
+            snake = Snake(scale=self.scale, step=self.step, direction="right",
                         x=self.mid_x, y=self.mid_y,
                         max_x=self.size_x, max_y=self.size_y,
-                        key_map={**key_map1,**key_map2}, color="blue")
+                        key_map={**key_map1,**key_map2}, color="blue",
+                        group=self.sprite_group,
+                        on_score_changed=self.change_score)
             return [snake]
         else:
-            snake1 = Snake(scale=self.scale, direction="right",
+            snake1 = Snake(scale=self.scale, step=self.step, direction="right",
                         x=self.mid_x+1, y=self.mid_y,
                         max_x=self.size_x, max_y=self.size_y,
-                        key_map=key_map1, color="blue")
-            snake2 = Snake(scale=self.scale, direction="left",
+                        key_map=key_map1, color="blue",
+                        group=self.sprite_group,
+                        on_score_changed=self.change_score)
+            snake2 = Snake(scale=self.scale, step=self.step, direction="left",
                         x=self.mid_x-1, y=self.mid_y,
                         max_x=self.size_x, max_y=self.size_y,
-                        key_map=key_map2, color="red")
+                        key_map=key_map2, color="red",
+                        group=self.sprite_group,
+                        on_score_changed=self.change_score)
             return [snake1, snake2]
 
     def create_donuts(self):
         def donut():
-            return Donut(scale=self.scale, lifetime=self.fps*9)
+            return Donut(scale=self.scale, lifetime=self.fps*9,
+                        on_reset=self.reset_donut)
         donuts = [donut() for _ in range(self.players)]
         return donuts
 
+    # The donut is put to a random cell that is not taken by the maze or a snake.
     def reset_donut(self, donut):
-        def on_maze(donut):
-            forbidden = [x for x in self.maze.cells]
-            return max([donut.collides(x) for x in forbidden])
-
-        def on_snake(donut):
-            forbidden = [x for s in self.snakes for x in s.tail + [s.head]]
-            return max([donut.collides(x) for x in forbidden])
+        forbidden = set(self.maze.cell_set)
+        for s in self.snakes:
+            forbidden |= s.tail_set
+            forbidden.add((s.head.x, s.head.y))
+        free_cells = [(x, y) for x in range(self.size_x) for y in range(self.size_y)
+                        if (x, y) not in forbidden]
         donut.reset()
-        donut.x = self.snakes[0].head.x
-        donut.y = self.snakes[0].head.y
-        while on_snake(donut) or on_maze(donut):
-            donut.x = r.randrange(self.size_x)
-            donut.y = r.randrange(self.size_y)
+        donut.x, donut.y = r.choice(free_cells)
+        donut.place(self.step)
 
     def next_level(self):
         self.level += 1
-        self.score = 0
-        self.maze = Maze(self.scale, self.level)
+        self.maze = Maze(self.scale, self.level, self.step,
+                        (self.stage_x, self.stage_y), self.bg_color)
+        self.sprite_group.clear(self.stage, self.maze.bg)
         for snake in self.snakes:
             snake.reset()
+        self.score = 0
         for donut in self.donuts:
             self.reset_donut(donut)
         self.firstFrame = True
+        self.full_refresh = True
 
     # Event handling:
     # - ESC quits
     # - P pauses
     # - keys in the snake's keymap control the snake
+    # - the whole stage is redrawn when the window is shown again
     def check_keys(self):
-        for event in pg.event.get():
+        for event in pg.event.get(eventtype=[pg.QUIT, pg.KEYDOWN, pg.WINDOWEXPOSED]):
             if event.type == pg.QUIT:
                 sys.exit()
-            elif event.type == pg.KEYDOWN:
-                if event.key == pg.K_ESCAPE:
-                    sys.exit()
-                elif event.key == pg.K_p:
-                    self.paused = not self.paused
-                else:
-                    for snake in self.snakes:
-                        if event.key in snake.key_map:
-                            snake.key_buffer.append(event.key)
-
-    def check_donuts(self):
-        for donut in self.donuts:
-            if donut.to_be_reset:
-                self.reset_donut(donut)
+            elif event.type == pg.WINDOWEXPOSED:
+                self.full_refresh = True
+            elif event.key == pg.K_ESCAPE:
+                sys.exit()
+            elif event.key == pg.K_p:
+                self.paused = not self.paused
+                self.full_refresh = True
+            elif event.key in self._all_key_snakes:
+                self._all_key_snakes[event.key].key_buffer.append(event.key)
 
     # The snake moves, the donut keeps waiting or jumps.
     def move_sprites(self):
         for sprite in self.sprites:
             sprite.move()
 
+    def change_score(self, diff):
+        self.score += diff
+
+    def render_text(self, text, title=False):
+        key = (text, title)
+        if key not in self._text_cache:
+            if title:
+                rendered = self.titlefont.render(text, False, self.font_color)
+            else:
+                rendered = self.font.render(text, False, self.font_color)
+            self._text_cache[key] = rendered
+        return self._text_cache[key]
+
     def display_text(self, text, pos, align="C", title=False):
-        if title:
-            text_rendered = self.titlefont.render(text, False, self.font_color)
-        else:
-            text_rendered = self.font.render(text, False, self.font_color)
+        text_rendered = self.render_text(text, title)
+        text_rect = self.text_rect(text_rendered, pos, align)
+        return self.stage.blit(text_rendered, text_rect)
+
+    def text_rect(self, text_rendered, pos, align):
         text_rect = text_rendered.get_rect()
         display_pos = ((pos[0] + 1) * self.step, (pos[1] + 1) * self.step)
         if align == "L":
@@ -446,25 +607,31 @@ class Snake_Game():
             text_rect.midright = display_pos
         else:
             text_rect.center = display_pos
-        self.stage.blit(text_rendered, text_rect)
+        return text_rect
 
     def handle_score_and_level(self):
-        self.score = sum([s.score for s in self.snakes])
         score_text = "Score: {} / {}".format(self.score, self.score_limit)
+        score_rendered = self.render_text(score_text)
         score_pos = (1, 1)
-        self.display_text(score_text, score_pos, "L")
+        score_rect = self.text_rect(score_rendered, score_pos, "L")
+        self.score_label.show(score_rendered, score_rect)
         level_text = "Level: {}".format(self.level)
+        level_rendered = self.render_text(level_text)
         level_pos = (30, 1)
-        self.display_text(level_text, level_pos, "R")
+        level_rect = self.text_rect(level_rendered, level_pos, "R")
+        self.level_label.show(level_rendered, level_rect)
 
     # The stage is refreshed with the score and the sprites.
+    # The sprite group restores the areas of the changed sprites
+    # from the background, redraws them, and returns the changed areas,
+    # and only those are updated on the screen.
     def refresh_stage(self):
-        self.stage.fill(self.bg_color)
-        self.maze.display(self.stage, self.step)
-        for sprite in self.sprites:
-            sprite.display(self.stage, self.step)
         self.handle_score_and_level()
-        pg.display.flip()
+        if self.full_refresh:
+            self.sprite_group.repaint_rect(self.stage.get_rect())
+            self.full_refresh = False
+        dirty_rects = self.sprite_group.draw(self.stage)
+        pg.display.update(dirty_rects)
 
     # Intro: The title is displayed. The game starts in 2 seconds.
     def intro(self):
@@ -513,6 +680,9 @@ class Snake_Game():
             if snake.collides(self.snakes, self.maze):
                 self.collidesound.play()
                 snake.reset()
+        for donut in self.donuts:
+            if donut.expired():
+                donut.on_reset(donut)
 
     def players_menu(self):
         menu_items = ["One player", "Two players"]
@@ -553,7 +723,6 @@ class Snake_Game():
                 else:
                     self.move_sprites()
                     self.check_collisions()
-                    self.check_donuts()
                     self.refresh_stage()
                     self.tick()
             self.level_outro()